@@ -0,0 +1,191 @@
+"""
+Loading of stored chapter files, with parsed chapters cached between runs.
+"""
+import hashlib
+import json
+import os
+import pickle
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+from loguru import logger
+
+from config import settings
+from models import Chapter
+
+
+def _is_chapter_file(name: str) -> bool:
+    """Whether a file name looks like chapter_NNNN.json."""
+    return name.startswith('chapter_') and name.endswith('.json') and name[8:-5].isdigit()
+
+
+def count_chapter_files(directory: Path) -> int:
+    """Count the chapter_NNNN.json files in a directory without building paths."""
+    if not directory.is_dir():
+        return 0
+    with os.scandir(directory) as entries:
+        return sum(1 for entry in entries if _is_chapter_file(entry.name))
+
+
+def list_chapter_files(directory: Path) -> List[Path]:
+    """List the chapter_NNNN.json files in a directory, sorted by chapter number.
+
+    One scandir pass with the number taken from the file name, so chapter_10000
+    sorts after chapter_9999.
+    """
+    if not directory.is_dir():
+        return []
+    with os.scandir(directory) as entries:
+        numbered = [(int(entry.name[8:-5]), entry.name) for entry in entries if _is_chapter_file(entry.name)]
+    numbered.sort()
+    return [directory / name for _, name in numbered]
+
+
+def load_chapter(chapter_file: Path) -> Chapter:
+    """Load and validate a single chapter file."""
+    # json.loads + model_validate is ~2.5x faster than model_validate_json on chapter-sized files
+    return Chapter.model_validate(json.loads(chapter_file.read_bytes()))
+
+
+def iter_chapters(chapter_files: Iterable[Path], read_ahead: int = 16) -> Iterator[Chapter]:
+    """Load chapters in file order, reading up to `read_ahead` files ahead on worker threads.
+
+    Only the chapters in flight are held in memory, so a whole book can be
+    streamed while the file reads still overlap.
+    """
+    with ThreadPoolExecutor(max_workers=read_ahead) as executor:
+        window = deque()
+        for chapter_file in chapter_files:
+            window.append(executor.submit(load_chapter, chapter_file))
+            if len(window) >= read_ahead:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+
+class LazyChapters:
+    """Chapters read from disk as they are iterated, in file order.
+
+    Lets exporters stream a whole book without holding every chapter in memory.
+    """
+
+    def __init__(self, chapter_files: Iterable[Path]):
+        self.chapter_files = list(chapter_files)
+
+    def __len__(self) -> int:
+        return len(self.chapter_files)
+
+    def __iter__(self) -> Iterator[Chapter]:
+        return iter_chapters(self.chapter_files)
+
+
+def load_chapters(chapter_files: List[Path]) -> List[Chapter]:
+    """Load chapters, reusing already parsed copies while the source files are unchanged.
+
+    Parsed chapters are kept in memory for the life of the process and pickled
+    under the cache directory for later runs. Callers share the returned
+    Chapter objects, so treat them as read-only.
+    """
+    fingerprint = tuple(
+        (str(p), st.st_mtime_ns, st.st_size) for p, st in ((p, p.stat()) for p in chapter_files)
+    )
+    return list(_load_chapters(fingerprint))
+
+
+@lru_cache(maxsize=1)
+def _load_chapters(fingerprint: Tuple[Tuple[str, int, int], ...]) -> Tuple[Chapter, ...]:
+    """Load the fingerprinted chapter files, going through the on-disk cache."""
+    key = hashlib.md5(repr([(Path(path).name, mtime, size) for path, mtime, size in fingerprint]).encode())
+    cache_file = settings.cache_dir / f"chapters_{key.hexdigest()}.pkl"
+
+    if cache_file.exists():
+        try:
+            with cache_file.open('rb') as f:
+                return tuple(pickle.load(f))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable chapter cache {cache_file.name}: {e}")
+
+    # Overlap the file reads; map() keeps the chapters in file order
+    with ThreadPoolExecutor() as executor:
+        chapters = list(executor.map(load_chapter, (Path(path) for path, _, _ in fingerprint)))
+
+    # Keep only the cache for the current set of chapters
+    settings.cache_dir.mkdir(parents=True, exist_ok=True)
+    for stale in settings.cache_dir.glob("chapters_*.pkl"):
+        stale.unlink()
+    tmp_file = cache_file.with_suffix('.tmp')
+    with tmp_file.open('wb') as f:
+        pickle.dump(chapters, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_file.replace(cache_file)
+
+    return tuple(chapters)
+
+
+def pending_runs(
+    chapter_files: List[Path],
+    translated_dir: Path,
+    slots: int = 1,
+    chapter_range: Optional[Tuple[Optional[int], Optional[int]]] = None,
+) -> List[Tuple[str, LazyChapters]]:
+    """Group the chapters that aren't translated yet into runs of consecutive chapters.
+
+    Each run is a (context, chapters) pair: the tail of the translation just before
+    the run, and the run's chapters in order, read from disk as the run reaches them.
+    Runs can be translated in parallel; see _split_runs for `slots`.
+    """
+    chapter_from, chapter_to = chapter_range or (None, None)
+    translated = set()
+    if translated_dir.is_dir():
+        with os.scandir(translated_dir) as entries:
+            translated = {entry.name for entry in entries}
+    runs = []
+    run = None
+    previous_file = None
+
+    # Decide from file names alone, so chapters that are already done are never read
+    for chapter_file in chapter_files:
+        chapter_number = int(chapter_file.name[8:-5])
+
+        # Filter by chapter range if specified
+        if chapter_from is not None and chapter_to is not None:
+            if not (chapter_from <= chapter_number <= chapter_to):
+                continue
+
+        # Check if already translated
+        if chapter_file.name in translated:
+            logger.info(f"Chapter {chapter_number} already translated, skipping")
+            # Its translation is only read if the next chapter needs it as context
+            previous_file = translated_dir / chapter_file.name
+            run = None
+            continue
+
+        if run is None:
+            # Load previous context from existing translation
+            previous_context = ""
+            if previous_file is not None:
+                previous_context = json.loads(previous_file.read_bytes())["content_vietnamese"][-1000:]
+            run = (previous_context, [])
+            runs.append(run)
+        run[1].append(chapter_file)
+
+    return [(context, LazyChapters(files)) for context, files in _split_runs(runs, slots)]
+
+
+def _split_runs(runs: List[Tuple[str, List[Path]]], slots: int) -> List[Tuple[str, List[Path]]]:
+    """Halve the longest runs until there is one per slot.
+
+    The second half of a split run starts without context from the chapter before it,
+    so with one slot the runs are left exactly as they are.
+    """
+    runs = list(runs)
+    while len(runs) < slots:
+        longest = max(runs, key=lambda run: len(run[1]), default=None)
+        if longest is None or len(longest[1]) < 2:
+            break
+        context, files = longest
+        middle = len(files) // 2
+        index = runs.index(longest)
+        runs[index:index + 1] = [(context, files[:middle]), ("", files[middle:])]
+    return runs
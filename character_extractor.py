@@ -1,62 +1,95 @@
 """
 Character name extraction and glossary management.
 """
+import json
 import re
-from typing import List, Set
-from pathlib import Path
-import jieba
+from bisect import bisect_left
+from typing import Dict, List, Set, Tuple
 from loguru import logger
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
+from chapter_store import list_chapter_files, load_chapters
 from config import settings
 from models import Chapter, Character, CharacterGlossary
 
 
+# Common Chinese surnames for name detection
+COMMON_SURNAMES = frozenset({
+    '王', '李', '张', '刘', '陈', '杨', '黄', '赵', '周', '吴',
+    '徐', '孙', '马', '朱', '胡', '郭', '何', '林', '高', '罗',
+    '郑', '梁', '谢', '宋', '唐', '许', '韩', '冯', '邓', '曹',
+    '彭', '曾', '萧', '田', '董', '潘', '袁', '蔡', '蒋', '余',
+    '叶', '陶', '姜', '范', '方', '石', '姚', '廖', '邹', '陆',
+})
+
+# Compile the name patterns once instead of 100 per-surname scans per chapter.
+# The lookahead keeps overlapping candidates (e.g. 王李明 and 李明), matching
+# what the separate per-surname scans used to return.
+_SURNAME_CLASS = '[' + ''.join(sorted(COMMON_SURNAMES)) + ']'
+_NAME_RE = re.compile(f'(?=({_SURNAME_CLASS}[一-龥]{{1,2}}(?![一-龥])))')
+_TITLE_RE = re.compile(
+    r'(?:局长|警官|先生|女士|小姐|夫人|老板|师傅|大师|将军|总裁|董事长|经理)([一-龥]{2,3})'
+)
+
+# Role by frequency: more than 10 mentions is supporting, 20 major, 50 protagonist
+_ROLE_THRESHOLDS = (10, 20, 50)
+_ROLES = ("minor", "supporting", "major", "protagonist")
+
+# Names sent per auto-translation request, and attempts before falling back to one-by-one
+_NAME_BATCH_SIZE = 20
+_NAME_BATCH_ATTEMPTS = 2
+
+# Below this many chapters, starting worker processes costs more than it saves
+_PARALLEL_MIN_CHAPTERS = 32
+
+
+def extract_potential_names(text: str) -> List[str]:
+    """Extract potential character names from text.
+    
+    Module-level (rather than a method) so it can be sent to worker processes.
+    """
+    # Pattern 1: Common Chinese name pattern (2-3 characters starting with surname)
+    # Pattern 2: Names after titles
+    return _NAME_RE.findall(text) + _TITLE_RE.findall(text)
+
+
 class CharacterExtractor:
     """Extract and manage character names from Chinese text."""
     
     def __init__(self):
-        # Common Chinese surnames for name detection
-        self.common_surnames = {
-            '王', '李', '张', '刘', '陈', '杨', '黄', '赵', '周', '吴',
-            '徐', '孙', '马', '朱', '胡', '郭', '何', '林', '高', '罗',
-            '郑', '梁', '谢', '宋', '唐', '许', '韩', '冯', '邓', '曹',
-            '彭', '曾', '萧', '田', '董', '潘', '袁', '蔡', '蒋', '余',
-            '叶', '陶', '姜', '范', '方', '石', '姚', '廖', '邹', '陆',
-        }
+        self.common_surnames = COMMON_SURNAMES
     
     def extract_potential_names(self, text: str) -> List[str]:
         """Extract potential character names from text."""
-        names = []
-        
-        # Pattern 1: Common Chinese name pattern (2-3 characters starting with surname)
-        for surname in self.common_surnames:
-            # 2-character names
-            pattern_2 = f'{surname}[一-龥](?![一-龥])'
-            matches_2 = re.findall(pattern_2, text)
-            names.extend(matches_2)
-            
-            # 3-character names
-            pattern_3 = f'{surname}[一-龥]{{2}}(?![一-龥])'
-            matches_3 = re.findall(pattern_3, text)
-            names.extend(matches_3)
-        
-        # Pattern 2: Names in quotes or after titles
-        title_pattern = r'(局长|警官|先生|女士|小姐|夫人|老板|师傅|大师|将军|总裁|董事长|经理)([一-龥]{2,3})'
-        title_matches = re.findall(title_pattern, text)
-        names.extend([match[1] for match in title_matches])
-        
-        return names
+        return extract_potential_names(text)
     
-    def count_name_frequencies(self, chapters: List[Chapter]) -> Counter:
-        """Count frequency of potential names across chapters."""
-        all_names = []
+    def count_name_frequencies(self, chapters: List[Chapter]) -> Tuple[Counter, Dict[str, int]]:
+        """Count frequency of potential names across chapters.
         
-        for chapter in chapters:
-            names = self.extract_potential_names(chapter.content_chinese)
-            all_names.extend(names)
+        Returns the frequencies and, for each name, the first chapter it was found in.
+        """
+        name_freq = Counter()
+        first_appearances = {}
+        texts = (chapter.content_chinese for chapter in chapters)
         
-        return Counter(all_names)
+        if len(chapters) < _PARALLEL_MIN_CHAPTERS:
+            self._merge_names(chapters, map(extract_potential_names, texts), name_freq, first_appearances)
+        else:
+            # Extraction is CPU-bound and independent per chapter, so spread it across cores
+            with ProcessPoolExecutor() as executor:
+                results = executor.map(extract_potential_names, texts, chunksize=16)
+                self._merge_names(chapters, results, name_freq, first_appearances)
+        
+        return name_freq, first_appearances
+    
+    @staticmethod
+    def _merge_names(chapters, results, name_freq: Counter, first_appearances: Dict[str, int]):
+        """Fold per-chapter name lists (in chapter order) into the running totals."""
+        for chapter, names in zip(chapters, results):
+            name_freq.update(names)
+            for name in names:
+                first_appearances.setdefault(name, chapter.chapter_number)
     
     def filter_common_names(self, name_freq: Counter, min_frequency: int = 3) -> List[str]:
         """Filter names that appear frequently enough to be characters."""
@@ -70,8 +103,8 @@ class CharacterExtractor:
         """Build character glossary from chapters."""
         logger.info(f"Extracting characters from {len(chapters)} chapters")
         
-        # Count name frequencies
-        name_freq = self.count_name_frequencies(chapters)
+        # Count name frequencies and note where each name first shows up
+        name_freq, first_appearances = self.count_name_frequencies(chapters)
         
         # Filter to get actual character names
         character_names = self.filter_common_names(name_freq, min_frequency)
@@ -82,23 +115,10 @@ class CharacterExtractor:
         glossary = CharacterGlossary()
         
         for name in sorted(character_names, key=lambda n: name_freq[n], reverse=True):
-            # Find first appearance
-            first_chapter = 0
-            for chapter in chapters:
-                if name in chapter.content_chinese:
-                    first_chapter = chapter.chapter_number
-                    break
+            first_chapter = first_appearances.get(name, 0)
             
             # Determine role based on frequency
-            freq = name_freq[name]
-            if freq > 50:
-                role = "protagonist"
-            elif freq > 20:
-                role = "major"
-            elif freq > 10:
-                role = "supporting"
-            else:
-                role = "minor"
+            role = _ROLES[bisect_left(_ROLE_THRESHOLDS, name_freq[name])]
             
             character = Character(
                 chinese=name,
@@ -120,10 +140,63 @@ class CharacterExtractor:
         # Create a translator instance (without glossary to avoid circular dependency)
         translator = Translator(CharacterGlossary())
         
-        for character in glossary.characters:
-            if not character.vietnamese:
-                try:
-                    prompt = f"""Translate this Chinese name to Vietnamese phonetically.
+        pending = [character for character in glossary.characters if not character.vietnamese]
+        batches = [pending[i:i + _NAME_BATCH_SIZE] for i in range(0, len(pending), _NAME_BATCH_SIZE)]
+        
+        # One request per batch of names, with several batches in flight at once
+        with ThreadPoolExecutor(max_workers=settings.translation_concurrency) as executor:
+            list(executor.map(lambda batch: self._translate_names(translator, batch), batches))
+        
+        return glossary
+    
+    def _translate_names(self, translator, batch: List[Character]):
+        """Translate a batch of names in place, retrying before going one by one."""
+        for attempt in range(1, _NAME_BATCH_ATTEMPTS + 1):
+            try:
+                vietnamese_names = self._translate_name_batch(translator, batch)
+                break
+            except Exception as e:
+                logger.warning(f"Batch name translation failed (attempt {attempt}): {e}")
+        else:
+            # Fall back to translating this batch one name at a time
+            for character in batch:
+                self._translate_name(translator, character)
+            return
+        
+        for character, vietnamese in zip(batch, vietnamese_names):
+            character.vietnamese = vietnamese
+            logger.info(f"  {character.chinese} → {character.vietnamese}")
+    
+    @staticmethod
+    def _translate_name_batch(translator, batch: List[Character]) -> List[str]:
+        """Translate a batch of names in one request, returning them in the same order."""
+        prompt = f"""Translate each of these Chinese names to Vietnamese phonetically.
+Chinese names (JSON array): {json.dumps([character.chinese for character in batch], ensure_ascii=False)}
+
+Reply with ONLY a JSON array of the Vietnamese romanizations, in the same order. For example:
+["葉陽", "王媽", "蘇婉容"] → ["Diệp Dương", "Vương Ma", "Tô Uyển Dung"]
+
+Vietnamese names:"""
+        
+        response = translator.translate_with_openai(prompt, "")
+        
+        # Tolerate code fences or stray text around the array
+        start, end = response.find('['), response.rfind(']')
+        if start == -1 or end < start:
+            raise ValueError(f"No JSON array in response: {response[:200]}")
+        names = json.loads(response[start:end + 1])
+        
+        if (not isinstance(names, list) or len(names) != len(batch)
+                or not all(isinstance(name, str) and name.strip() for name in names)):
+            raise ValueError(f"Expected {len(batch)} names, got: {response[:200]}")
+        
+        return [name.strip() for name in names]
+    
+    @staticmethod
+    def _translate_name(translator, character: Character):
+        """Translate a single name, keeping the Chinese name if that fails."""
+        try:
+            prompt = f"""Translate this Chinese name to Vietnamese phonetically.
 Chinese name: {character.chinese}
 
 Provide ONLY the Vietnamese romanization, nothing else. For example:
@@ -132,15 +205,13 @@ Provide ONLY the Vietnamese romanization, nothing else. For example:
 - 蘇婉容 → Tô Uyển Dung
 
 Vietnamese name:"""
-                    
-                    vietnamese = translator.translate_with_openai(prompt, "")
-                    character.vietnamese = vietnamese.strip()
-                    logger.info(f"  {character.chinese} → {character.vietnamese}")
-                except Exception as e:
-                    logger.error(f"Failed to translate name {character.chinese}: {e}")
-                    character.vietnamese = character.chinese
-        
-        return glossary
+            
+            vietnamese = translator.translate_with_openai(prompt, "")
+            character.vietnamese = vietnamese.strip()
+            logger.info(f"  {character.chinese} → {character.vietnamese}")
+        except Exception as e:
+            logger.error(f"Failed to translate name {character.chinese}: {e}")
+            character.vietnamese = character.chinese
 
 
 def update_glossary_translations():
@@ -182,7 +253,7 @@ def build_character_glossary():
     settings.ensure_directories()
     
     # Load all raw chapters
-    chapter_files = sorted(settings.raw_chapters_dir.glob("chapter_*.json"))
+    chapter_files = list_chapter_files(settings.raw_chapters_dir)
     
     if not chapter_files:
         logger.error("No chapters found. Run crawler first!")
@@ -190,11 +261,7 @@ def build_character_glossary():
     
     # Load first N chapters for initial glossary
     num_chapters = min(500, len(chapter_files))
-    chapters = []
-    
-    for chapter_file in chapter_files[:num_chapters]:
-        chapter = Chapter.model_validate_json(chapter_file.read_text(encoding='utf-8'))
-        chapters.append(chapter)
+    chapters = load_chapters(chapter_files[:num_chapters])
     
     logger.info(f"Building glossary from first {num_chapters} chapters")
     
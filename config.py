@@ -25,7 +25,8 @@ class Settings(BaseSettings):
     book_id: int = 273426
     start_chapter: int = 1
     end_chapter: str = "auto"
-    crawl_delay: float = 2.0
+    crawl_delay: float = 2.0  # Divided by crawl_concurrency: one request starts every crawl_delay / crawl_concurrency seconds
+    crawl_concurrency: int = 4  # Chapters in flight at once; at most this many start per crawl_delay
     user_agent: str = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
     
     # Translation Settings
@@ -33,13 +34,23 @@ class Settings(BaseSettings):
     ai_model: str = "gpt-4o"  # GPT-4o - best for translation
     max_tokens_per_request: int = 4000
     translation_batch_size: int = 5
+    translation_concurrency: int = 8  # Parallel API requests (chapters and glossary name batches)
+    # Unbroken stretches of untranslated chapters can be split into this many runs to
+    # translate in parallel, but each split point starts without the previous chapter's
+    # translation as context. Stretches already separated by translated chapters always
+    # run in parallel with full context, so 1 keeps every chapter's context.
+    translation_parallel_runs: int = 1
     context_window_paragraphs: int = 3
+    llm_parallel_slots: int = 1  # Chapters sent to the local LLM at once (match the server's parallel slots; splits runs as above)
     temperature: float = 0.3
     
     # Text-to-Speech Settings
     tts_provider: str = "edge-tts"  # "edge-tts", "openai", "elevenlabs", "google"
     tts_voice: str = "vi-VN-NamMinhNeural"  # Default Vietnamese voice
     tts_merge_chapters: bool = False  # Merge all chapters into single audio file
+    tts_concurrency: int = 4  # Chapters synthesized at once
+    tts_cache_size_mb: int = 1024  # Synthesized-audio cache; least recently used audio is dropped past this
+    elevenlabs_latency_level: int = 0  # 1-3 trade some quality for faster ElevenLabs responses; 0 = model default
     
     # Storage Paths
     data_dir: Path = Path("./data")
@@ -67,12 +78,18 @@ class Settings(BaseSettings):
         """Directory for glossaries."""
         return self.data_dir / "glossary"
     
+    @property
+    def cache_dir(self) -> Path:
+        """Directory for derived caches (safe to delete)."""
+        return self.data_dir / "cache"
+    
     def ensure_directories(self):
         """Create all required directories."""
         dirs = [
             self.data_dir / "raw" / "chapters",
             self.data_dir / "translated" / "chapters",
             self.data_dir / "glossary",
+            self.data_dir / "cache",
             self.output_dir,
             self.log_file.parent,
         ]
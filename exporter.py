@@ -2,14 +2,14 @@
 Export translated chapters to various formats (DOCX, EPUB, PDF).
 """
 from pathlib import Path
-from typing import List
+from typing import Collection
 from loguru import logger
 
 from models import Chapter
 from config import settings
 
 
-def export_to_docx(chapters: List[Chapter], output_file: Path):
+def export_to_docx(chapters: Collection[Chapter], output_file: Path):
     """Export chapters to Microsoft Word document."""
     try:
         from docx import Document
@@ -60,7 +60,7 @@ def export_to_docx(chapters: List[Chapter], output_file: Path):
     logger.success(f"Word document exported to {output_file}")
 
 
-def export_to_epub(chapters: List[Chapter], output_file: Path):
+def export_to_epub(chapters: Collection[Chapter], output_file: Path):
     """Export chapters to EPUB format."""
     try:
         from ebooklib import epub
@@ -92,19 +92,19 @@ def export_to_epub(chapters: List[Chapter], output_file: Path):
         )
         
         # Format content
-        content = f'''
+        parts = [f'''
         <h1>{chapter.title_vietnamese}</h1>
         <p><em>Original: {chapter.title_chinese}</em></p>
         <br/>
-        '''
+        ''']
         
         # Add paragraphs
         paragraphs = chapter.content_vietnamese.split('\n\n')
         for para in paragraphs:
             if para.strip():
-                content += f'<p>{para.strip()}</p>\n'
+                parts.append(f'<p>{para.strip()}</p>\n')
         
-        c.content = content
+        c.content = ''.join(parts)
         
         # Add chapter to book
         book.add_item(c)
@@ -158,7 +158,7 @@ def export_to_epub(chapters: List[Chapter], output_file: Path):
     logger.success(f"EPUB exported to {output_file}")
 
 
-def export_to_pdf(chapters: List[Chapter], output_file: Path):
+def export_to_pdf(chapters: Collection[Chapter], output_file: Path):
     """Export chapters to PDF format."""
     try:
         from weasyprint import HTML, CSS
@@ -169,8 +169,8 @@ def export_to_pdf(chapters: List[Chapter], output_file: Path):
     
     logger.info(f"Exporting to PDF: {output_file}")
     
-    # Generate HTML content
-    html_content = '''
+    # Generate HTML content (collected in a list and joined once; += on one big string is quadratic)
+    parts = ['''
     <!DOCTYPE html>
     <html>
     <head>
@@ -223,44 +223,45 @@ def export_to_pdf(chapters: List[Chapter], output_file: Path):
     <body>
         <div class="book-title">Translated Novel</div>
         <div class="metadata">Total Chapters: ''' + str(len(chapters)) + '''</div>
-    '''
+    ''']
     
     # Add each chapter
     for chapter in chapters:
-        html_content += f'''
+        parts.append(f'''
         <h1>{chapter.title_vietnamese}</h1>
         <p class="original-title">Original: {chapter.title_chinese}</p>
-        '''
+        ''')
         
         # Add paragraphs
         paragraphs = chapter.content_vietnamese.split('\n\n')
         for para in paragraphs:
             if para.strip():
-                html_content += f'<p>{para.strip()}</p>\n'
+                parts.append(f'<p>{para.strip()}</p>\n')
     
-    html_content += '''
+    parts.append('''
     </body>
     </html>
-    '''
+    ''')
     
     # Convert HTML to PDF
-    HTML(string=html_content).write_pdf(output_file)
+    HTML(string=''.join(parts)).write_pdf(output_file)
     logger.success(f"PDF exported to {output_file}")
 
 
-def export_to_markdown(chapters: List[Chapter], output_file: Path):
+def export_to_markdown(chapters: Collection[Chapter], output_file: Path):
     """Export chapters as Markdown file."""
-    with output_file.open('w', encoding='utf-8') as f:
+    # Binary with a large buffer: one encode and one buffered write per chapter
+    with output_file.open('wb', buffering=1 << 20) as f:
         # Write header
-        f.write("# Translated Novel\n\n")
-        f.write(f"Total Chapters: {len(chapters)}\n\n")
-        f.write("---\n\n")
+        f.write(f"# Translated Novel\n\nTotal Chapters: {len(chapters)}\n\n---\n\n".encode('utf-8'))
         
         # Write each chapter
         for chapter in chapters:
-            f.write(f"## {chapter.title_vietnamese}\n\n")
-            f.write(f"*Original: {chapter.title_chinese}*\n\n")
-            f.write(chapter.content_vietnamese)
-            f.write("\n\n---\n\n")
+            f.write(
+                f"## {chapter.title_vietnamese}\n\n"
+                f"*Original: {chapter.title_chinese}*\n\n"
+                f"{chapter.content_vietnamese}"
+                "\n\n---\n\n".encode('utf-8')
+            )
     
     logger.success(f"Markdown exported to {output_file}")
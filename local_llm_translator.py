@@ -1,14 +1,29 @@
 """
 Local LLM translator using LM Studio or any OpenAI-compatible API.
 """
-from typing import Optional
+import json
+import re
+import threading
+from bisect import bisect_right
+from itertools import accumulate
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional, Tuple
 import requests
 from loguru import logger
 from tqdm import tqdm
 
+from chapter_store import list_chapter_files, pending_runs
 from config import settings
 from models import Chapter, CharacterGlossary
 
+# Reasoning blocks that some local models emit before the answer
+_THINK_RE = re.compile(r'<think>.*?</think>', re.DOTALL)
+
+# Section markers for translating a chapter title and its first chunk in one request
+_TITLE_MARKER = "<<<TITLE>>>"
+_TEXT_MARKER = "<<<TEXT>>>"
+_SECTIONS_RE = re.compile(rf'{_TITLE_MARKER}\s*(.*?)\s*{_TEXT_MARKER}\s*(.*?)\s*$', re.DOTALL)
+
 
 class LocalLLMTranslator:
     """Translator using local LLM via OpenAI-compatible API."""
@@ -21,10 +36,22 @@ class LocalLLMTranslator:
         self.model = model
         self.glossary = glossary or CharacterGlossary()
         self.api_url = f"{base_url}/chat/completions"
+        self.refresh_glossary()
+    
+    def refresh_glossary(self, glossary: Optional[CharacterGlossary] = None):
+        """Snapshot the glossary names and rebuild the system prompt from them.
+        
+        The glossary doesn't change during a run, so this happens once at start-up;
+        call it again after editing or replacing the glossary.
+        """
+        if glossary is not None:
+            self.glossary = glossary
+        self._name_mapping = tuple(self.glossary.get_name_mapping().items())
+        self._system_prompt = self.build_system_prompt()
         
     def build_system_prompt(self) -> str:
         """Build the system prompt for translation."""
-        name_mapping = self.glossary.get_name_mapping()
+        name_mapping = self._name_mapping
         
         prompt = """You are a professional Chinese-to-Vietnamese translator specializing in novels.
 
@@ -45,19 +72,43 @@ Translation Guidelines:
         
         if name_mapping:
             prompt += "\n\nCharacter Name Glossary (Chinese → Vietnamese):\n"
-            for chinese, vietnamese in name_mapping.items():
-                prompt += f"- {chinese} → {vietnamese}\n"
+            prompt += "".join(f"- {chinese} → {vietnamese}\n" for chinese, vietnamese in name_mapping)
         
         return prompt
     
     def translate_text(self, text: str, context: str = "") -> str:
         """Translate text using local LLM."""
-        system_prompt = self.build_system_prompt()
-        
         user_message = f"Translate the following Chinese text to Vietnamese:\n\n{text}"
         if context:
             user_message = f"Context from previous section:\n{context}\n\n" + user_message
         
+        return self._complete(user_message)
+    
+    def translate_title_and_text(self, title_chinese: str, text: str, context: str = "") -> Tuple[str, str]:
+        """Translate a chapter title together with a chunk of text in one request.
+        
+        Falls back to separate requests if the reply doesn't keep the section markers.
+        """
+        user_message = (
+            "Translate the chapter title and the text below from Chinese to Vietnamese. "
+            f"Keep the {_TITLE_MARKER} and {_TEXT_MARKER} lines exactly as they are, "
+            "with each translation under its marker.\n\n"
+            f"{_TITLE_MARKER}\n{title_chinese}\n{_TEXT_MARKER}\n{text}"
+        )
+        if context:
+            user_message = f"Context from previous section:\n{context}\n\n" + user_message
+        
+        match = _SECTIONS_RE.search(_THINK_RE.sub('', self._complete(user_message)))
+        if match and match.group(1) and match.group(2):
+            return match.group(1), match.group(2)
+        
+        logger.warning("Reply lost the section markers, translating title and text separately")
+        return self.translate_chapter_title(title_chinese), self.translate_text(text, context)
+    
+    def _complete(self, user_message: str) -> str:
+        """Send one chat completion request and return the reply text."""
+        system_prompt = self._system_prompt
+        
         try:
             payload = {
                 "model": self.model,
@@ -67,18 +118,24 @@ Translation Guidelines:
                 ],
                 "temperature": 0.3,
                 "max_tokens": 4000,
-                "stream": False
+                "stream": True
             }
             
-            response = requests.post(
+            # Streamed, the timeout applies between tokens rather than to the whole generation
+            with requests.post(
                 self.api_url,
                 json=payload,
-                timeout=300  # 5 minute timeout for long translations
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            translation = result['choices'][0]['message']['content']
+                timeout=300,  # 5 minute timeout for long translations
+                stream=True,
+            ) as response:
+                response.raise_for_status()
+                
+                if response.headers.get('Content-Type', '').startswith('text/event-stream'):
+                    translation = self._read_stream(response)
+                else:
+                    # Server ignored "stream" and sent the whole completion at once
+                    result = response.json()
+                    translation = result['choices'][0]['message']['content']
             
             if translation:
                 translation = translation.strip()
@@ -96,6 +153,21 @@ Translation Guidelines:
             logger.error(f"Translation error: {e}")
             raise
     
+    @staticmethod
+    def _read_stream(response: requests.Response) -> str:
+        """Collect the content deltas of a server-sent-events chat completion."""
+        pieces = []
+        for line in response.iter_lines():
+            if not line.startswith(b'data:'):
+                continue
+            data = line[5:].strip()
+            if data == b'[DONE]':
+                break
+            delta = json.loads(data)['choices'][0].get('delta', {})
+            if delta.get('content'):
+                pieces.append(delta['content'])
+        return ''.join(pieces)
+    
     def translate_chapter_title(self, title_chinese: str) -> str:
         """Translate chapter title."""
         prompt = f"Translate this Chinese chapter title to Vietnamese (just the translation, no explanation):\n\n{title_chinese}"
@@ -103,24 +175,21 @@ Translation Guidelines:
     
     def split_into_chunks(self, text: str, max_length: int = 2000) -> list:
         """Split text into chunks for translation."""
+        if len(text) <= max_length:
+            return [text]
+        
         paragraphs = text.split('\n\n')
+        # offsets[i] is the length of the first i paragraphs (separators not counted)
+        offsets = [0, *accumulate(map(len, paragraphs))]
         chunks = []
-        current_chunk = []
-        current_length = 0
+        start = 0
         
-        for para in paragraphs:
-            para_length = len(para)
-            
-            if current_length + para_length > max_length and current_chunk:
-                chunks.append('\n\n'.join(current_chunk))
-                current_chunk = [para]
-                current_length = para_length
-            else:
-                current_chunk.append(para)
-                current_length += para_length
-        
-        if current_chunk:
-            chunks.append('\n\n'.join(current_chunk))
+        while start < len(paragraphs):
+            # Greedily take the most paragraphs that fit, but always at least one
+            end = max(bisect_right(offsets, offsets[start] + max_length) - 1, start + 1)
+            # Paragraph i starts at offsets[i] + 2 * i in the text, so the chunk is one slice
+            chunks.append(text[offsets[start] + 2 * start:offsets[end] + 2 * (end - 1)])
+            start = end
         
         return chunks
     
@@ -128,18 +197,21 @@ Translation Guidelines:
         """Translate a complete chapter."""
         logger.info(f"Translating chapter {chapter.chapter_number}: {chapter.title_chinese}")
         
-        # Translate title
-        chapter.title_vietnamese = self.translate_chapter_title(chapter.title_chinese)
-        
         # Split content into chunks if needed
         chunks = self.split_into_chunks(chapter.content_chinese)
-        translated_chunks = []
+        logger.debug(f"Translating title and chunk 1/{len(chunks)}")
         
-        for i, chunk in enumerate(chunks):
-            logger.debug(f"Translating chunk {i+1}/{len(chunks)}")
+        # The title rides along with the first chunk, saving a request per chapter
+        chapter.title_vietnamese, translated = self.translate_title_and_text(
+            chapter.title_chinese, chunks[0], previous_context
+        )
+        translated_chunks = [translated]
+        
+        for i, chunk in enumerate(chunks[1:], 2):
+            logger.debug(f"Translating chunk {i}/{len(chunks)}")
             
             # Use previous chunk as context for continuity
-            context = previous_context if i == 0 else translated_chunks[-1][-500:]
+            context = translated_chunks[-1][-500:]
             
             translated = self.translate_text(chunk, context)
             translated_chunks.append(translated)
@@ -162,44 +234,50 @@ def translate_all_chapters_local(base_url: str = "http://localhost:1234/v1", cha
     translator = LocalLLMTranslator(base_url=base_url, glossary=glossary)
     
     # Find all raw chapters
-    raw_chapters = sorted(settings.raw_chapters_dir.glob("chapter_*.json"))
+    raw_chapters = list_chapter_files(settings.raw_chapters_dir)
     
     logger.info(f"Found {len(raw_chapters)} chapters to translate")
     
-    previous_context = ""
+    slots = max(1, settings.llm_parallel_slots)
+    runs = pending_runs(raw_chapters, settings.translated_chapters_dir, slots, chapter_range=(chapter_from, chapter_to))
     
-    for chapter_file in tqdm(raw_chapters, desc="Translating chapters"):
-        # Load chapter
-        chapter = Chapter.model_validate_json(chapter_file.read_text(encoding='utf-8'))
-        
-        # Filter by chapter range if specified
-        if chapter_from is not None and chapter_to is not None:
-            if not (chapter_from <= chapter.chapter_number <= chapter_to):
-                continue
-        
-        # Check if already translated
-        translated_file = settings.translated_chapters_dir / chapter_file.name
-        if translated_file.exists():
-            logger.info(f"Chapter {chapter.chapter_number} already translated, skipping")
-            # Load previous context from existing translation
-            existing = Chapter.model_validate_json(translated_file.read_text(encoding='utf-8'))
-            previous_context = existing.content_vietnamese[-1000:]
-            continue
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=slots)
+    try:
+        with tqdm(total=sum(len(chapters) for _, chapters in runs), desc="Translating chapters") as pbar:
+            list(executor.map(lambda run: _translate_run(translator, *run, pbar, stop), runs))
+    except BaseException:
+        # Ctrl+C or a crash: runs finish the chapter in hand and start no other
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+
+
+def _translate_run(translator: LocalLLMTranslator, previous_context: str, chapters: Iterable[Chapter],
+                   pbar: tqdm, stop: threading.Event):
+    """Translate consecutive chapters in order, passing each one's tail on as context.
+    
+    Returns early once ``stop`` is set.
+    """
+    for chapter in chapters:
+        if stop.is_set():
+            return
         
         # Translate
         try:
             chapter = translator.translate_chapter(chapter, previous_context)
             # Remove <think>...</think> tags from translation and title
-            import re
-            chapter.content_vietnamese = re.sub(r'<think>.*?</think>', '', chapter.content_vietnamese, flags=re.DOTALL)
-            chapter.title_vietnamese = re.sub(r'<think>.*?</think>', '', chapter.title_vietnamese, flags=re.DOTALL)
+            chapter.content_vietnamese = _THINK_RE.sub('', chapter.content_vietnamese)
+            chapter.title_vietnamese = _THINK_RE.sub('', chapter.title_vietnamese)
             # Save translated chapter
-            chapter.save_translated(settings.translated_chapters_dir)
+            chapter.save(settings.translated_chapters_dir)
             # Update context for next chapter
             previous_context = chapter.content_vietnamese[-1000:]
         except Exception as e:
             logger.error(f"Failed to translate chapter {chapter.chapter_number}: {e}")
-            continue
+        finally:
+            pbar.update(1)
 
 
 if __name__ == "__main__":
@@ -6,9 +6,7 @@ from pathlib import Path
 from loguru import logger
 
 from config import settings
-from crawler import NovelCrawler
-from character_extractor import CharacterExtractor, build_character_glossary, update_glossary_translations
-from translator import Translator, translate_all_chapters
+from chapter_store import LazyChapters, count_chapter_files, list_chapter_files
 from models import CharacterGlossary
 
 
@@ -27,6 +25,7 @@ def setup_logging():
         format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}",
         level="DEBUG",
         rotation="10 MB",
+        enqueue=True,  # Format and write on a background thread, off the crawl/translate loops
     )
 
 
@@ -34,6 +33,7 @@ def cmd_crawl():
     """Crawl chapters from website."""
     logger.info("=== Starting Chapter Crawling ===")
     settings.ensure_directories()
+    from crawler import NovelCrawler
     
     crawler = NovelCrawler()
     start = settings.start_chapter
@@ -46,18 +46,24 @@ def cmd_crawl():
 def cmd_extract_characters():
     """Extract character names and build glossary."""
     logger.info("=== Extracting Characters ===")
+    from character_extractor import build_character_glossary
+    
     build_character_glossary()
 
 
 def cmd_update_characters():
     """Update character glossary with Vietnamese translations."""
     logger.info("=== Updating Character Translations ===")
+    from character_extractor import update_glossary_translations
+    
     update_glossary_translations()
 
 
 def cmd_translate():
     """Translate all chapters."""
     logger.info("=== Starting Translation ===")
+    from translator import translate_all_chapters
+    
     translate_all_chapters()
 
 
@@ -85,23 +91,17 @@ def cmd_export():
     logger.info("=== Exporting Translations ===")
     settings.ensure_directories()
     
-    # Load all translated chapters
-    chapter_files = sorted(settings.translated_chapters_dir.glob("chapter_*.json"))
+    # Find all translated chapters, in chapter order
+    chapter_files = list_chapter_files(settings.translated_chapters_dir)
     
     if not chapter_files:
         logger.error("No translated chapters found!")
         return
     
-    from models import Chapter
     from exporter import export_to_markdown, export_to_docx, export_to_epub, export_to_pdf
     
-    chapters = []
-    for chapter_file in chapter_files:
-        chapter = Chapter.model_validate_json(chapter_file.read_text(encoding='utf-8'))
-        chapters.append(chapter)
-    
-    # Sort by chapter number
-    chapters.sort(key=lambda c: c.chapter_number)
+    # Each exporter reads the chapters from disk as it writes them
+    chapters = LazyChapters(chapter_files)
     
     # Get output formats from config
     output_formats = settings.output_formats.lower().split(',')
@@ -129,8 +129,7 @@ def cmd_export():
 def cmd_generate_audio():
     """Generate audiobook from translated chapters."""
     logger.info("=== Generating Audiobook ===")
-    import asyncio
-    from tts_generator import generate_audiobook
+    from tts_generator import generate_audiobook, run_event_loop
     
     provider = settings.tts_provider
     voice = settings.tts_voice if settings.tts_voice else None
@@ -140,7 +139,7 @@ def cmd_generate_audio():
     logger.info(f"Voice: {voice or 'default'}")
     logger.info(f"Merge chapters: {merge}")
     
-    asyncio.run(generate_audiobook(provider=provider, voice=voice, merge_chapters=merge))
+    run_event_loop(generate_audiobook(provider=provider, voice=voice, merge_chapters=merge))
 
 
 def cmd_status():
@@ -148,8 +147,8 @@ def cmd_status():
     logger.info("=== Project Status ===")
     
     # Count chapters
-    raw_count = len(list(settings.raw_chapters_dir.glob("chapter_*.json")))
-    translated_count = len(list(settings.translated_chapters_dir.glob("chapter_*.json")))
+    raw_count = count_chapter_files(settings.raw_chapters_dir)
+    translated_count = count_chapter_files(settings.translated_chapters_dir)
     
     logger.info(f"Raw chapters crawled: {raw_count}")
     logger.info(f"Chapters translated: {translated_count}")
@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The modules live flat in the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import settings  # noqa: E402
+from models import Chapter  # noqa: E402
+from tts_generator import TTSGenerator  # noqa: E402
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point settings.data_dir at a temporary directory with the standard layout."""
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    settings.ensure_directories()
+    return tmp_path
+
+
+@pytest.fixture
+def raw_chapters(data_dir):
+    """Write ten short raw chapters and return them."""
+    chapters = [
+        Chapter(chapter_number=n, title_chinese=f"第{n}章", content_chinese=f"第{n}章的内容。")
+        for n in range(1, 11)
+    ]
+    for chapter in chapters:
+        chapter.save_raw(settings.raw_chapters_dir)
+    return chapters
+
+
+@pytest.fixture
+def generator(data_dir, monkeypatch):
+    """An OpenAI TTSGenerator writing under data_dir; tests replace its _synth call."""
+    monkeypatch.setattr(settings, "openai_api_key", "test-key")
+    return TTSGenerator("openai", output_dir=data_dir / "audio")
@@ -0,0 +1,36 @@
+"""Grouping of untranslated chapters into runs."""
+import chapter_store
+from chapter_store import list_chapter_files, pending_runs
+from config import settings
+
+
+def _translate(chapter):
+    chapter.content_vietnamese = f"Bản dịch {chapter.chapter_number}"
+    chapter.save_translated(settings.translated_chapters_dir)
+
+
+def test_runs_follow_translated_chapters_with_their_context(raw_chapters, monkeypatch):
+    _translate(raw_chapters[2])
+    _translate(raw_chapters[6])
+    loaded = []
+    monkeypatch.setattr(chapter_store, "load_chapter", lambda path: loaded.append(path.name) or path.name)
+    
+    runs = pending_runs(list_chapter_files(settings.raw_chapters_dir), settings.translated_chapters_dir)
+    
+    assert [(context, len(chapters)) for context, chapters in runs] == [("", 2), ("Bản dịch 3", 3), ("Bản dịch 7", 3)]
+    # Nothing is read until a run is iterated, and then only that run's chapters
+    assert loaded == []
+    assert list(runs[1][1]) == ["chapter_0004.json", "chapter_0005.json", "chapter_0006.json"]
+    assert loaded == ["chapter_0004.json", "chapter_0005.json", "chapter_0006.json"]
+
+
+def test_split_runs_start_without_context(raw_chapters):
+    _translate(raw_chapters[0])
+    
+    runs = pending_runs(list_chapter_files(settings.raw_chapters_dir), settings.translated_chapters_dir, slots=3)
+    
+    assert [(context, [c.chapter_number for c in chapters]) for context, chapters in runs] == [
+        ("Bản dịch 1", [2, 3, 4, 5]),
+        ("", [6, 7]),
+        ("", [8, 9, 10]),
+    ]
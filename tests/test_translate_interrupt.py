@@ -0,0 +1,103 @@
+"""Ctrl+C during a translation run stops it instead of finishing every chapter."""
+import re
+import signal
+import threading
+
+import pytest
+
+from chapter_store import list_chapter_files
+from config import settings
+from local_llm_translator import LocalLLMTranslator, translate_all_chapters_local
+from models import Chapter
+import translator
+from translator import _TEXT_MARKER, _TITLE_MARKER, Translator, translate_all_chapters
+
+pytestmark = pytest.mark.skipif(not hasattr(signal, "pthread_kill"), reason="needs signal.pthread_kill")
+
+INTERRUPT_AT = 3
+
+
+def _interrupting_translate(released: threading.Event):
+    """A translate_chapter stand-in that presses Ctrl+C while translating chapter INTERRUPT_AT."""
+    main_thread = threading.main_thread().ident
+    
+    def translate_chapter(self, chapter, previous_context=""):
+        if chapter.chapter_number == INTERRUPT_AT:
+            signal.pthread_kill(main_thread, signal.SIGINT)
+            # Hold the chapter until the driver has seen the interrupt
+            released.wait(5)
+        chapter.title_vietnamese = f"Chương {chapter.chapter_number}"
+        chapter.content_vietnamese = f"Nội dung {chapter.chapter_number}"
+        return chapter
+    
+    return translate_chapter
+
+
+def _run_interrupted(run):
+    """Call run(), expecting Ctrl+C, then let the worker threads wind down."""
+    threads_before = set(threading.enumerate())
+    released = threading.Event()
+    try:
+        with pytest.raises(KeyboardInterrupt):
+            run(released)
+    finally:
+        released.set()
+        for thread in set(threading.enumerate()) - threads_before:
+            if not thread.daemon:  # leave tqdm's monitor thread be
+                thread.join(5)
+
+
+def test_local_translation_stops_on_interrupt(raw_chapters, monkeypatch):
+    monkeypatch.setattr(settings, "llm_parallel_slots", 1)
+    
+    def run(released):
+        monkeypatch.setattr(LocalLLMTranslator, "translate_chapter", _interrupting_translate(released))
+        translate_all_chapters_local()
+    
+    _run_interrupted(run)
+    
+    # The chapter in hand is finished and saved; nothing after it is started
+    translated = [path.name for path in list_chapter_files(settings.translated_chapters_dir)]
+    assert translated == [f"chapter_{n:04d}.json" for n in range(1, INTERRUPT_AT + 1)]
+
+
+def test_api_translation_stops_between_chunks(data_dir, monkeypatch):
+    monkeypatch.setattr(settings, "ai_provider", "openai")
+    monkeypatch.setattr(settings, "openai_api_key", "test-key")
+    monkeypatch.setattr(settings, "translation_concurrency", 1)
+    
+    # Three one-paragraph chunks per chapter, each tagged with its chapter and chunk number
+    for n in range(1, 6):
+        content = "\n\n".join(f"c{n}k{i} " + "字" * 1500 for i in range(1, 4))
+        Chapter(chapter_number=n, title_chinese=f"第{n}章", content_chinese=content).save_raw(settings.raw_chapters_dir)
+    
+    main_thread = threading.main_thread().ident
+    requests = []
+    client_open = []
+    
+    def run(released):
+        def complete(self, user_message):
+            # The chunk comes after any context from the previous one
+            chunk = re.findall(r"c\d+k\d+", user_message)[-1]
+            requests.append(chunk)
+            if chunk == f"c{INTERRUPT_AT}k2":
+                signal.pthread_kill(main_thread, signal.SIGINT)
+                released.wait(5)
+                client_open.append(translator._http_client.cache_info().currsize == 1)
+            if _TITLE_MARKER in user_message:
+                return f"{_TITLE_MARKER}\nChương\n{_TEXT_MARKER}\n{chunk}"
+            return chunk
+        
+        monkeypatch.setattr(Translator, "_complete_openai", complete)
+        translate_all_chapters()
+    
+    try:
+        _run_interrupted(run)
+    finally:
+        translator.close_http_client()
+    
+    # The request in flight completes on an open client, but no further chunk of that chapter is sent
+    assert client_open == [True]
+    assert requests[-1] == f"c{INTERRUPT_AT}k2"
+    translated = [path.name for path in list_chapter_files(settings.translated_chapters_dir)]
+    assert translated == [f"chapter_{n:04d}.json" for n in range(1, INTERRUPT_AT)]
@@ -0,0 +1,68 @@
+"""Requests made by the API translator."""
+from types import SimpleNamespace
+
+import pytest
+
+from config import settings
+from models import Character, CharacterGlossary
+from translator import _TEXT_MARKER, _TITLE_MARKER, Translator
+
+
+@pytest.fixture
+def translator(monkeypatch):
+    monkeypatch.setattr(settings, "ai_provider", "openai")
+    monkeypatch.setattr(settings, "openai_api_key", "test-key")
+    translator = Translator()
+    translator.messages = []
+    
+    def complete_openai(user_message):
+        translator.messages.append(user_message)
+        return translator.replies.pop(0)
+    
+    monkeypatch.setattr(translator, "_complete_openai", complete_openai)
+    return translator
+
+
+def test_title_and_text_go_out_as_one_marked_request(translator):
+    translator.replies = [f"{_TITLE_MARKER}\nChương 1\n{_TEXT_MARKER}\nNội dung"]
+    
+    assert translator.translate_title_and_text("第一章", "内容", "Đoạn trước") == ("Chương 1", "Nội dung")
+    
+    [message] = translator.messages
+    assert message.startswith("Context from previous section:\nĐoạn trước\n\nTranslate the chapter title and the text")
+    assert message.endswith(f"{_TITLE_MARKER}\n第一章\n{_TEXT_MARKER}\n内容")
+    # The instructions are not themselves handed over as text to translate
+    assert "Translate the following Chinese text" not in message
+
+
+def test_lost_markers_fall_back_to_separate_requests(translator):
+    translator.replies = ["Chương 1 Nội dung", "Chương 1", "Nội dung"]
+    
+    assert translator.translate_title_and_text("第一章", "内容") == ("Chương 1", "Nội dung")
+    assert len(translator.messages) == 3
+
+
+def test_glossary_edits_apply_after_refresh(monkeypatch):
+    monkeypatch.setattr(settings, "ai_provider", "openai")
+    monkeypatch.setattr(settings, "openai_api_key", "test-key")
+    glossary = CharacterGlossary(characters=[Character(chinese="林动", vietnamese="Lâm Động")])
+    translator = Translator(glossary)
+    system_prompts = []
+    
+    def create(**params):
+        system_prompts.append(params["messages"][0]["content"])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Bản dịch"))])
+    
+    monkeypatch.setattr(translator.client.chat.completions, "create", create)
+    
+    glossary.add_character(Character(chinese="小貂", vietnamese="Tiểu Điêu"))
+    glossary.characters[0].vietnamese = "Lâm Đông"
+    translator.translate_text("林动和小貂")
+    # The mapping is a snapshot until the glossary is refreshed
+    assert "小貂" not in system_prompts[-1]
+    
+    translator.refresh_glossary()
+    translator.translate_text("林动和小貂")
+    
+    assert translator._name_mapping == (("林动", "Lâm Đông"), ("小貂", "Tiểu Điêu"))
+    assert "- 林动 → Lâm Đông\n- 小貂 → Tiểu Điêu\n" in system_prompts[-1]
@@ -0,0 +1,39 @@
+"""Synthesized audio is reused only for identical requests."""
+import asyncio
+
+from config import settings
+from tts_generator import TTSGenerator
+
+
+def _elevenlabs(data_dir, monkeypatch, latency_level):
+    monkeypatch.setattr(settings, "elevenlabs_latency_level", latency_level)
+    generator = TTSGenerator("elevenlabs", output_dir=data_dir / "audio")
+    generator.requests = []
+    
+    async def synth(text, output_file):
+        generator.requests.append(text)
+        output_file.write_bytes(b"audio")
+    
+    generator._synth = synth
+    return generator
+
+
+def _synthesize(generator, name):
+    async def main():
+        await generator._synthesize("Xin chào", generator.output_dir / name)
+        await generator.aclose()
+    
+    asyncio.run(main())
+
+
+def test_cache_key_includes_audio_settings(data_dir, monkeypatch):
+    default = _elevenlabs(data_dir, monkeypatch, 0)
+    _synthesize(default, "a.mp3")
+    
+    same = _elevenlabs(data_dir, monkeypatch, 0)
+    _synthesize(same, "b.mp3")
+    faster = _elevenlabs(data_dir, monkeypatch, 3)
+    _synthesize(faster, "c.mp3")
+    
+    assert same.requests == []
+    assert faster.requests == ["Xin chào"]
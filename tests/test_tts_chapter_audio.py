@@ -0,0 +1,53 @@
+"""A chapter's audio is made whole or not at all."""
+import asyncio
+
+import pytest
+
+from config import settings
+from models import Chapter
+from tts_generator import TTSGenerator, _existing_audio, generate_audiobook
+
+
+def test_failed_piece_cancels_the_rest_and_leaves_no_audio(generator):
+    chapter = Chapter(chapter_number=7, title_chinese="第七章", title_vietnamese="Chương bảy",
+                      content_chinese="内容", content_vietnamese="Nội dung chương bảy")
+    finished = []
+    
+    async def synth(text, output_file):
+        if text.startswith("Chương 7"):
+            raise ValueError("Invalid voice")
+        await asyncio.sleep(0.1)
+        output_file.write_bytes(b"audio")
+        finished.append(output_file)
+    
+    generator._synth = synth
+    
+    async def main():
+        with pytest.raises(ValueError, match="Invalid voice"):
+            await generator.generate_chapter_audio(chapter, split_paragraphs=False)
+        # Other chapters keep the loop running well past the content request
+        await asyncio.sleep(0.3)
+    
+    asyncio.run(main())
+    
+    # The content request was cancelled, so nothing marks the chapter as done
+    assert finished == []
+    assert _existing_audio(generator.output_dir) == {}
+
+
+def test_unreadable_chapter_is_skipped(data_dir, monkeypatch):
+    monkeypatch.setattr(settings, "openai_api_key", "test-key")
+    for n in (1, 2, 3):
+        Chapter(chapter_number=n, title_chinese=f"第{n}章", title_vietnamese=f"Chương {n}",
+                content_chinese="内容", content_vietnamese=f"Nội dung {n}").save_translated(settings.translated_chapters_dir)
+    (settings.translated_chapters_dir / "chapter_0002.json").write_text("{not json")
+    
+    async def generate_audio_openai(self, text, output_file):
+        output_file.write_bytes(text.encode())
+        return output_file
+    
+    monkeypatch.setattr(TTSGenerator, "generate_audio_openai", generate_audio_openai)
+    
+    asyncio.run(generate_audiobook(provider="openai"))
+    
+    assert sorted(_existing_audio(data_dir / "audio")) == [1, 3]
@@ -0,0 +1,76 @@
+"""Which failed TTS requests are retried."""
+import asyncio
+
+import httpx
+import pytest
+from openai import APITimeoutError
+
+import tts_generator
+
+
+class StatusError(Exception):
+    """A provider error carrying an HTTP status, like the OpenAI and httpx errors."""
+    
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class InvalidArgument(Exception):
+    """Shaped like google.api_core.exceptions.InvalidArgument."""
+    code = 400
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(tts_generator.random, "uniform", lambda low, high: 0.0)
+
+
+def _synth_failing_with(generator, errors):
+    """Make each synthesis call raise the next error, succeeding once they run out; return the call log."""
+    calls = []
+    
+    async def synth(text, output_file):
+        calls.append(text)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+    
+    generator._synth = synth
+    return calls
+
+
+@pytest.mark.parametrize("error", [
+    StatusError(400),
+    StatusError(403),
+    InvalidArgument("bad voice"),
+    ValueError("Invalid voice"),
+    PermissionError(),
+    KeyError("audio"),
+])
+def test_permanent_errors_are_raised_without_retrying(generator, tmp_path, error):
+    calls = _synth_failing_with(generator, [error])
+    
+    with pytest.raises(type(error)):
+        asyncio.run(generator._synth_with_retry("Xin chào", tmp_path / "out.mp3"))
+    
+    assert len(calls) == 1
+    # Nor do they count towards pausing every other request
+    assert generator._breaker._failures == 0
+
+
+@pytest.mark.parametrize("status", [408, 429, 500, 503])
+def test_transient_errors_are_retried(generator, tmp_path, status):
+    calls = _synth_failing_with(generator, [StatusError(status), ConnectionError("reset")])
+    
+    asyncio.run(generator._synth_with_retry("Xin chào", tmp_path / "out.mp3"))
+    
+    assert len(calls) == 3
+
+
+def test_provider_connection_errors_are_retried(generator, tmp_path):
+    request = httpx.Request("POST", "https://api.openai.com/v1/audio/speech")
+    calls = _synth_failing_with(generator, [APITimeoutError(request), httpx.ConnectError("refused")])
+    
+    asyncio.run(generator._synth_with_retry("Xin chào", tmp_path / "out.mp3"))
+    
+    assert len(calls) == 3
@@ -1,17 +1,59 @@
 """
 AI-powered translation module with context awareness.
 """
+import importlib.util
 import os
-from typing import List, Optional, Dict
+import re
+import threading
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import accumulate
+from typing import Iterable, List, Optional, Dict, Tuple
 from pathlib import Path
-from openai import OpenAI
-from anthropic import Anthropic
+import httpx
 from loguru import logger
 from tqdm import tqdm
 
+from chapter_store import list_chapter_files, pending_runs
 from config import settings
 from models import Chapter, CharacterGlossary
 
+# Section markers for translating a chapter title and its first chunk in one request
+_TITLE_MARKER = "<<<TITLE>>>"
+_TEXT_MARKER = "<<<TEXT>>>"
+_SECTIONS_RE = re.compile(rf'{_TITLE_MARKER}\s*(.*?)\s*{_TEXT_MARKER}\s*(.*?)\s*$', re.DOTALL)
+
+
+def _translation_message(text: str, context: str = "") -> str:
+    """The user message asking for a plain translation of `text`."""
+    user_message = f"Translate the following Chinese text to Vietnamese:\n\n{text}"
+    if context:
+        user_message = f"Context from previous section:\n{context}\n\n" + user_message
+    return user_message
+
+
+class TranslationStopped(Exception):
+    """Raised by translate_chapter when its stop event is set between chunks."""
+
+
+@lru_cache(maxsize=None)
+def _http_client() -> httpx.Client:
+    """HTTP client shared by every Translator, so API connections are reused across instances."""
+    return httpx.Client(
+        # Parallel requests share one multiplexed connection when the h2 package is installed
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        timeout=httpx.Timeout(600.0, connect=5.0),  # The SDKs' own defaults
+    )
+
+
+def close_http_client():
+    """Close the shared HTTP client; the next Translator opens a new one."""
+    if _http_client.cache_info().currsize:
+        _http_client().close()
+        _http_client.cache_clear()
+
 
 class Translator:
     """AI-powered translator with context awareness."""
@@ -21,17 +63,32 @@ class Translator:
         self.model = settings.ai_model
         self.glossary = glossary or CharacterGlossary()
         
-        # Initialize AI client
+        # Initialize AI client; the SDKs are imported here as they slow down CLI start-up
         if self.provider == "openai":
-            self.client = OpenAI(api_key=settings.openai_api_key)
+            from openai import OpenAI
+            self.client = OpenAI(api_key=settings.openai_api_key, http_client=_http_client())
         elif self.provider == "anthropic":
-            self.client = Anthropic(api_key=settings.anthropic_api_key)
+            from anthropic import Anthropic
+            self.client = Anthropic(api_key=settings.anthropic_api_key, http_client=_http_client())
         else:
             raise ValueError(f"Unsupported AI provider: {self.provider}")
+        
+        self.refresh_glossary()
+    
+    def refresh_glossary(self, glossary: Optional[CharacterGlossary] = None):
+        """Snapshot the glossary names and rebuild the system prompt from them.
+        
+        The glossary doesn't change during a run, so this happens once at start-up;
+        call it again after editing or replacing the glossary.
+        """
+        if glossary is not None:
+            self.glossary = glossary
+        self._name_mapping = tuple(self.glossary.get_name_mapping().items())
+        self._system_prompt = self.build_system_prompt()
     
     def build_system_prompt(self) -> str:
         """Build the system prompt for translation."""
-        name_mapping = self.glossary.get_name_mapping()
+        name_mapping = self._name_mapping
         
         prompt = """You are a professional Chinese-to-Vietnamese translator specializing in novels.
 
@@ -51,18 +108,17 @@ Translation Guidelines:
         
         if name_mapping:
             prompt += "\n\nCharacter Name Glossary (Chinese → Vietnamese):\n"
-            for chinese, vietnamese in name_mapping.items():
-                prompt += f"- {chinese} → {vietnamese}\n"
+            prompt += "".join(f"- {chinese} → {vietnamese}\n" for chinese, vietnamese in name_mapping)
         
         return prompt
     
     def translate_with_openai(self, text: str, context: str = "") -> str:
         """Translate using OpenAI GPT."""
-        system_prompt = self.build_system_prompt()
-        
-        user_message = f"Translate the following Chinese text to Vietnamese:\n\n{text}"
-        if context:
-            user_message = f"Context from previous section:\n{context}\n\n" + user_message
+        return self._complete_openai(_translation_message(text, context))
+    
+    def _complete_openai(self, user_message: str) -> str:
+        """Send one OpenAI chat completion request and return the reply text."""
+        system_prompt = self._system_prompt
         
         try:
             # Use max_completion_tokens for newer models like gpt-5, fall back to max_tokens for older models
@@ -99,18 +155,20 @@ Translation Guidelines:
     
     def translate_with_anthropic(self, text: str, context: str = "") -> str:
         """Translate using Anthropic Claude."""
-        system_prompt = self.build_system_prompt()
-        
-        user_message = f"Translate the following Chinese text to Vietnamese:\n\n{text}"
-        if context:
-            user_message = f"Context from previous section:\n{context}\n\n" + user_message
+        return self._complete_anthropic(_translation_message(text, context))
+    
+    def _complete_anthropic(self, user_message: str) -> str:
+        """Send one Anthropic messages request and return the reply text."""
+        system_prompt = self._system_prompt
         
         try:
             response = self.client.messages.create(
                 model=self.model,
                 max_tokens=settings.max_tokens_per_request,
                 temperature=settings.temperature,
-                system=system_prompt,
+                # Mark the prompt (guidelines + glossary) cacheable so repeat requests reuse it server-side;
+                # OpenAI caches repeated prefixes automatically since the prompt is identical each call
+                system=[{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}],
                 messages=[
                     {"role": "user", "content": user_message}
                 ]
@@ -132,50 +190,87 @@ Translation Guidelines:
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
     
+    def _complete(self, user_message: str) -> str:
+        """Send a ready-made user message to the configured AI provider."""
+        if self.provider == "openai":
+            return self._complete_openai(user_message)
+        elif self.provider == "anthropic":
+            return self._complete_anthropic(user_message)
+        else:
+            raise ValueError(f"Unsupported provider: {self.provider}")
+    
     def translate_chapter_title(self, title_chinese: str) -> str:
         """Translate chapter title."""
         prompt = f"Translate this Chinese chapter title to Vietnamese (just the translation, no explanation):\n\n{title_chinese}"
         return self.translate_text(prompt)
     
+    def translate_title_and_text(self, title_chinese: str, text: str, context: str = "") -> Tuple[str, str]:
+        """Translate a chapter title together with a chunk of text in one request.
+        
+        Falls back to separate requests if the reply doesn't keep the section markers.
+        """
+        user_message = (
+            "Translate the chapter title and the text below from Chinese to Vietnamese. "
+            f"Keep the {_TITLE_MARKER} and {_TEXT_MARKER} lines exactly as they are, "
+            "with each translation under its marker.\n\n"
+            f"{_TITLE_MARKER}\n{title_chinese}\n{_TEXT_MARKER}\n{text}"
+        )
+        if context:
+            user_message = f"Context from previous section:\n{context}\n\n" + user_message
+        
+        match = _SECTIONS_RE.search(self._complete(user_message))
+        if match and match.group(1) and match.group(2):
+            return match.group(1), match.group(2)
+        
+        logger.warning("Reply lost the section markers, translating title and text separately")
+        return self.translate_chapter_title(title_chinese), self.translate_text(text, context)
+    
     def split_into_chunks(self, text: str, max_length: int = 2000) -> List[str]:
         """Split text into chunks for translation."""
+        if len(text) <= max_length:
+            return [text]
+        
         paragraphs = text.split('\n\n')
+        # offsets[i] is the length of the first i paragraphs (separators not counted)
+        offsets = [0, *accumulate(map(len, paragraphs))]
         chunks = []
-        current_chunk = []
-        current_length = 0
+        start = 0
         
-        for para in paragraphs:
-            para_length = len(para)
-            
-            if current_length + para_length > max_length and current_chunk:
-                chunks.append('\n\n'.join(current_chunk))
-                current_chunk = [para]
-                current_length = para_length
-            else:
-                current_chunk.append(para)
-                current_length += para_length
-        
-        if current_chunk:
-            chunks.append('\n\n'.join(current_chunk))
+        while start < len(paragraphs):
+            # Greedily take the most paragraphs that fit, but always at least one
+            end = max(bisect_right(offsets, offsets[start] + max_length) - 1, start + 1)
+            # Paragraph i starts at offsets[i] + 2 * i in the text, so the chunk is one slice
+            chunks.append(text[offsets[start] + 2 * start:offsets[end] + 2 * (end - 1)])
+            start = end
         
         return chunks
     
-    def translate_chapter(self, chapter: Chapter, previous_context: str = "") -> Chapter:
-        """Translate a complete chapter."""
-        logger.info(f"Translating chapter {chapter.chapter_number}: {chapter.title_chinese}")
+    def translate_chapter(self, chapter: Chapter, previous_context: str = "",
+                          stop: Optional[threading.Event] = None) -> Chapter:
+        """Translate a complete chapter.
         
-        # Translate title
-        chapter.title_vietnamese = self.translate_chapter_title(chapter.title_chinese)
+        Raises TranslationStopped before the next chunk once ``stop`` is set.
+        """
+        logger.info(f"Translating chapter {chapter.chapter_number}: {chapter.title_chinese}")
         
         # Split content into chunks if needed
         chunks = self.split_into_chunks(chapter.content_chinese)
-        translated_chunks = []
+        logger.debug(f"Translating title and chunk 1/{len(chunks)}")
+        
+        # The title rides along with the first chunk, saving a request per chapter
+        chapter.title_vietnamese, translated = self.translate_title_and_text(
+            chapter.title_chinese, chunks[0], previous_context
+        )
+        translated_chunks = [translated]
         
-        for i, chunk in enumerate(chunks):
-            logger.debug(f"Translating chunk {i+1}/{len(chunks)}")
+        for i, chunk in enumerate(chunks[1:], 2):
+            if stop is not None and stop.is_set():
+                raise TranslationStopped(f"Stopped at chunk {i}/{len(chunks)} of chapter {chapter.chapter_number}")
+            
+            logger.debug(f"Translating chunk {i}/{len(chunks)}")
             
             # Use previous chunk as context for continuity
-            context = previous_context if i == 0 else translated_chunks[-1][-500:]
+            context = translated_chunks[-1][-500:]
             
             translated = self.translate_text(chunk, context)
             translated_chunks.append(translated)
@@ -198,35 +293,56 @@ def translate_all_chapters():
     translator = Translator(glossary)
     
     # Find all raw chapters
-    raw_chapters = sorted(settings.raw_chapters_dir.glob("chapter_*.json"))
+    raw_chapters = list_chapter_files(settings.raw_chapters_dir)
     
     logger.info(f"Found {len(raw_chapters)} chapters to translate")
     
-    previous_context = ""
+    # Runs of consecutive untranslated chapters go out in parallel; within a run each
+    # chapter still gets the previous one's translation as context
+    concurrency = max(1, settings.translation_concurrency)
+    runs = pending_runs(raw_chapters, settings.translated_chapters_dir, settings.translation_parallel_runs)
     
-    for chapter_file in tqdm(raw_chapters, desc="Translating chapters"):
-        # Load chapter
-        chapter = Chapter.model_validate_json(chapter_file.read_text(encoding='utf-8'))
-        
-        # Check if already translated
-        translated_file = settings.translated_chapters_dir / chapter_file.name
-        if translated_file.exists():
-            logger.info(f"Chapter {chapter.chapter_number} already translated, skipping")
-            continue
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        with tqdm(total=sum(len(chapters) for _, chapters in runs), desc="Translating chapters") as pbar:
+            list(executor.map(lambda run: _translate_run(translator, *run, pbar, stop), runs))
+    except BaseException:
+        # Ctrl+C or a crash: no new chapter or chunk is sent, queued runs are dropped. The
+        # HTTP client stays open, so the requests still in flight can finish
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    close_http_client()
+
+
+def _translate_run(translator: Translator, previous_context: str, chapters: Iterable[Chapter],
+                   pbar: tqdm, stop: threading.Event):
+    """Translate consecutive chapters in order, passing each one's tail on as context.
+    
+    Returns early once ``stop`` is set, leaving a partly translated chapter unsaved.
+    """
+    for chapter in chapters:
+        if stop.is_set():
+            return
         
         # Translate
         try:
-            chapter = translator.translate_chapter(chapter, previous_context)
+            chapter = translator.translate_chapter(chapter, previous_context, stop)
             
             # Save translated chapter
-            chapter.save_translated(settings.translated_chapters_dir)
+            chapter.save(settings.translated_chapters_dir)
             
             # Update context for next chapter
             previous_context = chapter.content_vietnamese[-1000:]
             
+        except TranslationStopped:
+            return
         except Exception as e:
             logger.error(f"Failed to translate chapter {chapter.chapter_number}: {e}")
-            continue
+        finally:
+            pbar.update(1)
 
 
 if __name__ == "__main__":
@@ -2,13 +2,21 @@
 Text-to-Speech generator for Vietnamese audiobook creation.
 Supports multiple TTS providers with natural storytelling voice.
 """
+import asyncio
+import hashlib
+import importlib.util
 import os
+import random
+import shutil
+import time
 from pathlib import Path
-from typing import Optional, Literal
+from typing import BinaryIO, Optional, Literal
+import httpx
 from loguru import logger
-from tqdm import tqdm
+from tqdm.asyncio import tqdm_asyncio
 import json
 
+from chapter_store import list_chapter_files, load_chapter
 from config import settings
 from models import Chapter
 
@@ -16,6 +24,62 @@ from models import Chapter
 TTSProvider = Literal["edge-tts", "openai", "elevenlabs", "google"]
 
 
+class _CircuitBreaker:
+    """Pauses all requests for `cooldown` seconds after `threshold` failures in a row."""
+    
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._open_until = 0.0
+    
+    async def wait(self):
+        """Wait out the pause if the breaker is open."""
+        delay = self._open_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    
+    def record(self, success: bool):
+        """Count a request's outcome, opening the breaker when failures pile up."""
+        if success:
+            self._failures = 0
+            return
+        self._failures += 1
+        if self._failures >= self.threshold:
+            logger.warning(f"{self._failures} TTS failures in a row, pausing requests for {self.cooldown:.0f}s")
+            self._open_until = time.monotonic() + self.cooldown
+            self._failures = 0
+
+
+# Dropped connections and timeouts worth retrying with any provider; providers add their own
+_NETWORK_ERRORS = (httpx.TransportError, ConnectionError, asyncio.TimeoutError, TimeoutError)
+
+# Google API errors worth retrying, by class name and by gRPC status
+_TRANSIENT_GOOGLE_ERRORS = {"ServiceUnavailable", "DeadlineExceeded", "ResourceExhausted"}
+_TRANSIENT_GRPC_CODES = {"UNAVAILABLE", "DEADLINE_EXCEEDED", "RESOURCE_EXHAUSTED"}
+
+
+def _is_transient(error: Exception, network_errors: tuple = _NETWORK_ERRORS) -> bool:
+    """Whether a failed request is worth retrying.
+    
+    Only network errors, timeouts and the HTTP statuses 408, 429 and 5xx are; anything
+    else (a bad voice, a disk error, a bug) is raised straight away.
+    """
+    if isinstance(error, network_errors):
+        return True
+    
+    grpc_code = getattr(error, "grpc_status_code", None)
+    if type(error).__name__ in _TRANSIENT_GOOGLE_ERRORS or getattr(grpc_code, "name", None) in _TRANSIENT_GRPC_CODES:
+        return True
+    
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if status is None:
+        # Google API errors carry their HTTP status as .code
+        status = getattr(error, "code", None)
+    return isinstance(status, int) and (status in (408, 429) or status >= 500)
+
+
 class TTSGenerator:
     """Generate audio from Vietnamese text using various TTS providers."""
     
@@ -47,21 +111,38 @@ class TTSGenerator:
         
         self.voice = voice or self.default_voices.get(provider)
         
-        # Initialize provider
-        if provider == "edge-tts":
-            self._init_edge_tts()
-        elif provider == "openai":
-            self._init_openai_tts()
-        elif provider == "elevenlabs":
-            self._init_elevenlabs()
-        elif provider == "google":
-            self._init_google_tts()
+        # Caps provider requests in flight across all chapters being synthesized
+        self._semaphore = asyncio.Semaphore(max(1, settings.tts_concurrency))
+        self._breaker = _CircuitBreaker()
+        
+        # Synthesized audio by content hash, so unchanged text is never sent twice
+        self.cache_dir = settings.cache_dir / "tts"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._in_flight: dict[str, asyncio.Event] = {}
+        
+        # Initialize provider and pick its synthesis call once
+        providers = {
+            "edge-tts": (self._init_edge_tts, self.generate_audio_edge),
+            "openai": (self._init_openai_tts, self.generate_audio_openai),
+            "elevenlabs": (self._init_elevenlabs, self.generate_audio_elevenlabs),
+            "google": (self._init_google_tts, self.generate_audio_google),
+        }
+        if provider not in providers:
+            raise ValueError(f"Unsupported TTS provider: {provider}")
+        init_provider, self._synth = providers[provider]
+        self._network_errors = _NETWORK_ERRORS
+        # Anything besides the voice and text that changes the audio; part of the cache key
+        self._audio_options = ""
+        init_provider()
     
     def _init_edge_tts(self):
         """Initialize Microsoft Edge TTS (FREE, good quality)."""
         try:
+            import aiohttp
             import edge_tts
+            from edge_tts.exceptions import NoAudioReceived, WebSocketError
             self.edge_tts = edge_tts
+            self._network_errors += (aiohttp.ClientError, NoAudioReceived, WebSocketError)
             logger.info(f"Initialized Edge TTS with voice: {self.voice}")
         except ImportError:
             logger.error("edge-tts not installed. Run: pip install edge-tts")
@@ -70,8 +151,13 @@ class TTSGenerator:
     def _init_openai_tts(self):
         """Initialize OpenAI TTS (PAID, excellent quality)."""
         try:
-            from openai import OpenAI
-            self.openai_client = OpenAI(api_key=settings.openai_api_key)
+            from openai import APIConnectionError, AsyncOpenAI
+            self.openai_client = AsyncOpenAI(api_key=settings.openai_api_key)
+            self.openai_model = "tts-1-hd"  # or "tts-1" for faster/cheaper
+            self.openai_speed = 1.0  # Adjust for storytelling pace
+            self._audio_options = f"{self.openai_model}|speed={self.openai_speed}"
+            # Also covers APITimeoutError
+            self._network_errors += (APIConnectionError,)
             logger.info(f"Initialized OpenAI TTS with voice: {self.voice}")
         except ImportError:
             logger.error("openai not installed. Run: pip install openai")
@@ -79,82 +165,176 @@ class TTSGenerator:
     
     def _init_elevenlabs(self):
         """Initialize ElevenLabs TTS (PAID, very natural)."""
-        try:
-            from elevenlabs import VoiceSettings, set_api_key
-            set_api_key(settings.elevenlabs_api_key)
-            logger.info(f"Initialized ElevenLabs TTS with voice: {self.voice}")
-        except ImportError:
-            logger.error("elevenlabs not installed. Run: pip install elevenlabs")
-            raise
+        # Called over its HTTP API on one long-lived client, so connections are reused between requests
+        self._http = httpx.AsyncClient(
+            base_url="https://api.elevenlabs.io/v1",
+            headers={"xi-api-key": settings.elevenlabs_api_key},
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            timeout=60.0,
+        )
+        self.elevenlabs_model = "eleven_multilingual_v2"  # Best for Vietnamese
+        self._elevenlabs_params = {"output_format": "mp3_44100_128"}
+        if settings.elevenlabs_latency_level:
+            # Deprecated by ElevenLabs in favour of per-model defaults, so only sent when asked for
+            self._elevenlabs_params["optimize_streaming_latency"] = settings.elevenlabs_latency_level
+        self._audio_options = f"{self.elevenlabs_model}|{sorted(self._elevenlabs_params.items())}"
+        logger.info(f"Initialized ElevenLabs TTS with voice: {self.voice}")
     
     def _init_google_tts(self):
         """Initialize Google Cloud TTS (PAID, good quality)."""
         try:
             from google.cloud import texttospeech
-            self.google_client = texttospeech.TextToSpeechClient()
+            self.texttospeech = texttospeech
+            self.google_client = texttospeech.TextToSpeechAsyncClient()
+            # Same voice and output format for every request, so built once
+            self._google_voice = texttospeech.VoiceSelectionParams(
+                language_code="vi-VN",
+                name=self.voice,
+                ssml_gender=texttospeech.SsmlVoiceGender.FEMALE
+            )
+            self._google_audio_config = texttospeech.AudioConfig(
+                audio_encoding=texttospeech.AudioEncoding.MP3,
+                speaking_rate=1.0,
+                pitch=0.0
+            )
+            self._audio_options = f"{self._google_voice}|{self._google_audio_config}"
             logger.info(f"Initialized Google TTS with voice: {self.voice}")
         except ImportError:
             logger.error("google-cloud-texttospeech not installed")
             raise
     
+    async def aclose(self):
+        """Close the provider client's connections."""
+        if hasattr(self, "_http"):
+            await self._http.aclose()
+        if hasattr(self, "openai_client"):
+            await self.openai_client.close()
+        if hasattr(self, "google_client"):
+            await self.google_client.transport.close()
+    
     async def generate_audio_edge(self, text: str, output_file: Path) -> Path:
         """Generate audio using Microsoft Edge TTS (FREE)."""
         communicate = self.edge_tts.Communicate(text, self.voice)
-        await communicate.save(str(output_file))
+        # Written to disk as the audio arrives; renamed into place only once complete
+        part_file = output_file.with_suffix('.part')
+        with part_file.open('wb') as f:
+            async for message in communicate.stream():
+                if message["type"] == "audio":
+                    f.write(message["data"])
+        part_file.replace(output_file)
         logger.debug(f"Generated audio: {output_file}")
         return output_file
     
-    def generate_audio_openai(self, text: str, output_file: Path) -> Path:
+    async def generate_audio_openai(self, text: str, output_file: Path) -> Path:
         """Generate audio using OpenAI TTS."""
-        response = self.openai_client.audio.speech.create(
-            model="tts-1-hd",  # or "tts-1" for faster/cheaper
+        # Written to disk as the audio arrives; renamed into place only once complete
+        part_file = output_file.with_suffix('.part')
+        async with self.openai_client.audio.speech.with_streaming_response.create(
+            model=self.openai_model,
             voice=self.voice,
             input=text,
-            speed=1.0  # Adjust for storytelling pace
-        )
-        response.stream_to_file(str(output_file))
+            speed=self.openai_speed
+        ) as response:
+            await response.stream_to_file(part_file)
+        part_file.replace(output_file)
         logger.debug(f"Generated audio: {output_file}")
         return output_file
     
-    def generate_audio_elevenlabs(self, text: str, output_file: Path) -> Path:
+    async def generate_audio_elevenlabs(self, text: str, output_file: Path) -> Path:
         """Generate audio using ElevenLabs."""
-        from elevenlabs import generate, save
-        
-        audio = generate(
-            text=text,
-            voice=self.voice,
-            model="eleven_multilingual_v2"  # Best for Vietnamese
-        )
-        save(audio, str(output_file))
+        # Written to disk as the audio arrives; renamed into place only once complete
+        part_file = output_file.with_suffix('.part')
+        async with self._http.stream(
+            "POST",
+            f"/text-to-speech/{self.voice}/stream",
+            params=self._elevenlabs_params,
+            json={
+                "text": text,
+                "model_id": self.elevenlabs_model
+            },
+            headers={"Accept": "audio/mpeg"},
+        ) as response:
+            response.raise_for_status()
+            with part_file.open('wb') as f:
+                async for chunk in response.aiter_bytes(1 << 16):
+                    f.write(chunk)
+        part_file.replace(output_file)
         logger.debug(f"Generated audio: {output_file}")
         return output_file
     
-    def generate_audio_google(self, text: str, output_file: Path) -> Path:
+    async def generate_audio_google(self, text: str, output_file: Path) -> Path:
         """Generate audio using Google Cloud TTS."""
-        from google.cloud import texttospeech
-        
-        synthesis_input = texttospeech.SynthesisInput(text=text)
-        voice = texttospeech.VoiceSelectionParams(
-            language_code="vi-VN",
-            name=self.voice,
-            ssml_gender=texttospeech.SsmlVoiceGender.FEMALE
-        )
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.MP3,
-            speaking_rate=1.0,
-            pitch=0.0
-        )
-        
-        response = self.google_client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice,
-            audio_config=audio_config
+        response = await self.google_client.synthesize_speech(
+            input=self.texttospeech.SynthesisInput(text=text),
+            voice=self._google_voice,
+            audio_config=self._google_audio_config
         )
         
         output_file.write_bytes(response.audio_content)
         logger.debug(f"Generated audio: {output_file}")
         return output_file
     
+    async def _synthesize(self, text: str, output_file: Path) -> Path:
+        """Generate audio with the configured provider, reusing cached audio for text it has seen."""
+        key = hashlib.sha256(f"{self.provider}|{self._audio_options}|{self.voice}|{text}".encode('utf-8')).hexdigest()
+        cached = self.cache_dir / f"{key}.mp3"
+        
+        # The same text may be in flight for another file; wait for it to reach the cache
+        while key in self._in_flight:
+            await self._in_flight[key].wait()
+        
+        if cached.exists():
+            os.utime(cached)  # Mark as recently used for prune_cache
+            _link_or_copy(cached, output_file)
+            logger.debug(f"Reused cached audio: {output_file}")
+            return output_file
+        
+        self._in_flight[key] = done = asyncio.Event()
+        try:
+            # The old file may be a link to another cache entry, which writing in place would overwrite
+            output_file.unlink(missing_ok=True)
+            async with self._semaphore:
+                await self._synth_with_retry(text, output_file)
+            _link_or_copy(output_file, cached)
+        finally:
+            # If this failed, a waiting duplicate finds no cache entry and makes its own attempt
+            del self._in_flight[key]
+            done.set()
+        return output_file
+    
+    async def _synth_with_retry(self, text: str, output_file: Path, attempts: int = 5):
+        """Call the provider, retrying transient failures with jittered exponential backoff."""
+        for attempt in range(1, attempts + 1):
+            await self._breaker.wait()
+            try:
+                await self._synth(text, output_file)
+            except Exception as e:
+                if not _is_transient(e, self._network_errors):
+                    # Retrying won't help, and it says nothing about the provider's health
+                    raise
+                self._breaker.record(False)
+                if attempt == attempts:
+                    raise
+                delay = random.uniform(0, min(30.0, 0.5 * 2 ** attempt))
+                logger.warning(f"TTS request failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            else:
+                self._breaker.record(True)
+                return
+    
+    def prune_cache(self):
+        """Delete the least recently used cached audio until the cache fits in tts_cache_size_mb."""
+        with os.scandir(self.cache_dir) as entries:
+            files = [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries if entry.is_file()]
+        
+        excess = sum(size for _, size, _ in files) - settings.tts_cache_size_mb * 1024 * 1024
+        for _, size, path in sorted(files):
+            if excess <= 0:
+                break
+            os.unlink(path)
+            excess -= size
+    
     async def generate_chapter_audio(
         self,
         chapter: Chapter,
@@ -176,62 +356,53 @@ class TTSGenerator:
         chapter_dir = self.output_dir / f"chapter_{chapter.chapter_number:04d}"
         chapter_dir.mkdir(parents=True, exist_ok=True)
         
-        audio_files = []
-        
         # Add title narration
         title_text = f"Chương {chapter.chapter_number}: {chapter.title_vietnamese}"
-        title_file = chapter_dir / "00_title.mp3"
-        
-        if self.provider == "edge-tts":
-            await self.generate_audio_edge(title_text, title_file)
-        elif self.provider == "openai":
-            self.generate_audio_openai(title_text, title_file)
-        elif self.provider == "elevenlabs":
-            self.generate_audio_elevenlabs(title_text, title_file)
-        elif self.provider == "google":
-            self.generate_audio_google(title_text, title_file)
-        
-        audio_files.append(title_file)
+        jobs = [(title_text, chapter_dir / "00_title.mp3")]
         
         # Process content
         if split_paragraphs:
-            paragraphs = chapter.content_vietnamese.split('\n\n')
-            for i, paragraph in enumerate(paragraphs, 1):
-                if not paragraph.strip():
-                    continue
-                
-                output_file = chapter_dir / f"{i:03d}_paragraph.mp3"
-                
-                if self.provider == "edge-tts":
-                    await self.generate_audio_edge(paragraph, output_file)
-                elif self.provider == "openai":
-                    self.generate_audio_openai(paragraph, output_file)
-                elif self.provider == "elevenlabs":
-                    self.generate_audio_elevenlabs(paragraph, output_file)
-                elif self.provider == "google":
-                    self.generate_audio_google(paragraph, output_file)
-                
-                audio_files.append(output_file)
+            # Short paragraphs are grouped, so each request carries a useful amount of text
+            paragraphs = _coalesce(chapter.content_vietnamese.split('\n\n'))
+            jobs += [
+                (paragraph, chapter_dir / f"{i:03d}_paragraph.mp3")
+                for i, paragraph in enumerate(paragraphs, 1)
+            ]
         else:
             # Generate single audio file for entire chapter
-            output_file = chapter_dir / "full_chapter.mp3"
-            
-            if self.provider == "edge-tts":
-                await self.generate_audio_edge(chapter.content_vietnamese, output_file)
-            elif self.provider == "openai":
-                self.generate_audio_openai(chapter.content_vietnamese, output_file)
-            elif self.provider == "elevenlabs":
-                self.generate_audio_elevenlabs(chapter.content_vietnamese, output_file)
-            elif self.provider == "google":
-                self.generate_audio_google(chapter.content_vietnamese, output_file)
-            
-            audio_files.append(output_file)
+            jobs.append((chapter.content_vietnamese, chapter_dir / "full_chapter.mp3"))
+        
+        # The pieces are independent, so they are all requested at once; if one fails the rest are cancelled
+        try:
+            async with asyncio.TaskGroup() as group:
+                tasks = [group.create_task(self._synthesize(text, output_file)) for text, output_file in jobs]
+        except BaseException as e:
+            # Leftover pieces would pass for a finished chapter on the next run
+            shutil.rmtree(chapter_dir, ignore_errors=True)
+            if isinstance(e, BaseExceptionGroup):
+                # Report the failure itself; the other pieces were only cancelled because of it
+                raise e.exceptions[0] from None
+            raise
+        audio_files = [task.result() for task in tasks]
         
         logger.success(f"Generated {len(audio_files)} audio files for chapter {chapter.chapter_number}")
         return audio_files
     
     def merge_audio_files(self, audio_files: list[Path], output_file: Path):
-        """Merge multiple audio files into one using ffmpeg."""
+        """Merge multiple audio files into one.
+        
+        MP3 streams are made of self-contained frames, so MP3 files are simply joined
+        byte for byte (minus ID3v1 tags between files); anything else goes through ffmpeg.
+        """
+        if all(audio.suffix.lower() == '.mp3' for audio in audio_files):
+            # Unbuffered, so sendfile and plain writes can't interleave out of order
+            with output_file.open('wb', buffering=0) as out:
+                for i, audio in enumerate(audio_files, 1):
+                    with audio.open('rb') as src:
+                        _copy_mp3(src, out, strip_tag=i < len(audio_files))
+            logger.success(f"Merged {len(audio_files)} files into {output_file}")
+            return
+        
         try:
             import subprocess
             
@@ -264,6 +435,79 @@ class TTSGenerator:
             raise
 
 
+def _coalesce(paragraphs: list[str], max_chars: int = 800) -> list[str]:
+    """Join consecutive non-blank paragraphs up to max_chars, splitting only between paragraphs."""
+    groups = []
+    current = []
+    length = 0
+    for paragraph in paragraphs:
+        if not paragraph.strip():
+            continue
+        if current and length + 2 + len(paragraph) > max_chars:
+            groups.append('\n\n'.join(current))
+            current = []
+            length = 0
+        length += len(paragraph) + (2 if current else 0)
+        current.append(paragraph)
+    if current:
+        groups.append('\n\n'.join(current))
+    return groups
+
+
+def _copy_mp3(src: BinaryIO, out: BinaryIO, strip_tag: bool):
+    """Append an MP3 file to out, leaving off a trailing 128-byte ID3v1 tag if strip_tag is set."""
+    size = os.fstat(src.fileno()).st_size
+    if strip_tag and size >= 128:
+        src.seek(size - 128)
+        if src.read(3) == b'TAG':
+            size -= 128
+        src.seek(0)
+    
+    # Kernel-side copy where the platform has it (Linux), plain buffered copy otherwise
+    if hasattr(os, 'sendfile'):
+        offset = 0
+        try:
+            while offset < size:
+                sent = os.sendfile(out.fileno(), src.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+            return
+        except OSError:
+            # Not supported for this pair of files; carry on from where it stopped
+            src.seek(offset)
+            size -= offset
+    while size > 0:
+        chunk = src.read(min(size, 4 << 20))
+        if not chunk:
+            break
+        out.write(chunk)
+        size -= len(chunk)
+
+
+def _link_or_copy(source: Path, target: Path):
+    """Hard-link target to source (no data copied), copying where links aren't possible."""
+    target.unlink(missing_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        # Different filesystem, or one without hard links
+        shutil.copyfile(source, target)
+
+
+def _existing_audio(output_dir: Path) -> dict[int, list[Path]]:
+    """Map chapter numbers to their sorted MP3 files, for chapter directories that have any."""
+    existing = {}
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            if entry.is_dir() and entry.name.startswith('chapter_') and entry.name[8:].isdigit():
+                with os.scandir(entry.path) as files:
+                    audio_files = sorted(Path(f.path) for f in files if f.name.endswith('.mp3'))
+                if audio_files:
+                    existing[int(entry.name[8:])] = audio_files
+    return existing
+
+
 async def generate_audiobook(
     provider: TTSProvider = "edge-tts",
     voice: Optional[str] = None,
@@ -282,33 +526,46 @@ async def generate_audiobook(
     tts = TTSGenerator(provider=provider, voice=voice)
     
     # Find all translated chapters
-    translated_chapters = sorted(settings.translated_chapters_dir.glob("chapter_*.json"))
+    translated_chapters = list_chapter_files(settings.translated_chapters_dir)
     
     logger.info(f"Found {len(translated_chapters)} translated chapters")
     logger.info(f"Using {provider} with voice: {tts.voice}")
     
-    all_audio_files = []
+    # Chapters with audio already, found in one pass over the audio directory
+    existing_audio = _existing_audio(tts.output_dir)
     
-    for chapter_file in tqdm(translated_chapters, desc="Generating audiobook"):
-        # Load chapter
-        chapter = Chapter.model_validate_json(chapter_file.read_text(encoding='utf-8'))
-        
-        # Check if audio already exists
-        chapter_dir = tts.output_dir / f"chapter_{chapter.chapter_number:04d}"
-        if chapter_dir.exists() and any(chapter_dir.glob("*.mp3")):
-            logger.info(f"Audio for chapter {chapter.chapter_number} already exists, skipping")
-            if merge_chapters:
-                all_audio_files.extend(sorted(chapter_dir.glob("*.mp3")))
-            continue
+    # Chapters are synthesized concurrently, at most tts_concurrency at a time
+    semaphore = asyncio.Semaphore(max(1, settings.tts_concurrency))
+    
+    async def process_chapter(chapter_file: Path) -> list[Path]:
+        # Check if audio already exists, before reading the chapter
+        chapter_number = int(chapter_file.name[8:-5])
+        if chapter_number in existing_audio:
+            logger.info(f"Audio for chapter {chapter_number} already exists, skipping")
+            return existing_audio[chapter_number]
         
-        # Generate audio
-        try:
-            audio_files = await tts.generate_chapter_audio(chapter, split_paragraphs=False)
-            if merge_chapters:
-                all_audio_files.extend(audio_files)
-        except Exception as e:
-            logger.error(f"Failed to generate audio for chapter {chapter.chapter_number}: {e}")
-            continue
+        async with semaphore:
+            try:
+                # Load chapter in a worker thread, so parsing overlaps other chapters' synthesis
+                chapter = await asyncio.to_thread(load_chapter, chapter_file)
+                
+                # Generate audio
+                return await tts.generate_chapter_audio(chapter, split_paragraphs=False)
+            except Exception as e:
+                logger.error(f"Failed to generate audio for chapter {chapter_number}: {e}")
+                return []
+    
+    # Results come back in chapter order, whatever order the chapters finish in
+    try:
+        results = await tqdm_asyncio.gather(
+            *(process_chapter(chapter_file) for chapter_file in translated_chapters),
+            desc="Generating audiobook",
+        )
+    finally:
+        await tts.aclose()
+        # A directory walk and deletes, kept off the event loop
+        await asyncio.to_thread(tts.prune_cache)
+    all_audio_files = [audio_file for audio_files in results for audio_file in audio_files]
     
     # Merge all chapters into single audiobook file
     if merge_chapters and all_audio_files:
@@ -319,8 +576,15 @@ async def generate_audiobook(
     logger.success("Audiobook generation complete!")
 
 
+def run_event_loop(main):
+    """Run a coroutine to completion, on uvloop where it is installed (it isn't available on Windows)."""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(main)
+    return uvloop.run(main)
+
+
 if __name__ == "__main__":
-    import asyncio
-    
     # Generate audiobook using free Edge TTS
-    asyncio.run(generate_audiobook(provider="edge-tts"))
+    run_event_loop(generate_audiobook(provider="edge-tts"))